@@ -18,6 +18,11 @@ import matplotlib.pyplot as plt
 from datetime import datetime
 
 
+STOPWORDS = frozenset({'of', 'and', 'the', 'in', 'for', 'with', 'to', 'a', 'an'})
+GENERAL_TERMS = ('general', 'overview', 'introduction', 'all', 'complete', 'comprehensive')
+BASIC_TERMS = ('introduction', 'basics', 'fundamentals', 'overview')
+
+
 class RecursiveSubtopicGenerator:
     def __init__(self):
         self.topic_generator = DynamicTopicGenerator()
@@ -27,6 +32,7 @@ class RecursiveSubtopicGenerator:
         self.tree_data = {}
         self.generation_log = []
         self.mece_violations = []
+        self._progress_cache = None  # topic_id -> UserSkillProgress, loaded once per run
         
     async def generate_recursive_subtopics(self, db, topic: Topic, user_id: int, depth: int = 0, max_depth: int = 5):
         """Recursively generate subtopics for a topic"""
@@ -92,6 +98,7 @@ class RecursiveSubtopicGenerator:
             except Exception as e:
                 print(f"{'  ' * depth}❌ Error generating for {topic.name}: {e}")
                 await db.rollback()
+                self._progress_cache = None  # pending rows were discarded
                 return
         else:
             print(f"{'  ' * depth}📋 Found {len(children)} existing children")
@@ -110,15 +117,19 @@ class RecursiveSubtopicGenerator:
                 break
             await self.generate_recursive_subtopics(db, child, user_id, depth + 1, max_depth)
     
+    async def _load_progress_cache(self, db, user_id: int) -> Dict[int, UserSkillProgress]:
+        """Load all of the user's progress rows once so later lookups skip the DB"""
+        if self._progress_cache is None:
+            result = await db.execute(
+                select(UserSkillProgress).where(UserSkillProgress.user_id == user_id)
+            )
+            self._progress_cache = {p.topic_id: p for p in result.scalars()}
+        return self._progress_cache
+    
     async def _ensure_user_progress(self, db, user_id: int, topic_id: int):
         """Ensure user has competent level progress for topic"""
-        result = await db.execute(
-            select(UserSkillProgress).where(
-                UserSkillProgress.user_id == user_id,
-                UserSkillProgress.topic_id == topic_id
-            )
-        )
-        progress = result.scalar_one_or_none()
+        cache = await self._load_progress_cache(db, user_id)
+        progress = cache.get(topic_id)
         
         if not progress:
             progress = UserSkillProgress(
@@ -132,6 +143,7 @@ class RecursiveSubtopicGenerator:
             )
             db.add(progress)
             await db.flush()
+            cache[topic_id] = progress
         elif progress.current_mastery_level == "novice":
             progress.current_mastery_level = "competent"
             progress.mastery_level = "competent"
@@ -141,6 +153,11 @@ class RecursiveSubtopicGenerator:
     
     async def _unlock_topic_for_user(self, db, user_id: int, topic_id: int):
         """Unlock a topic for the user"""
+        cache = await self._load_progress_cache(db, user_id)
+        if topic_id in cache:
+            cache[topic_id].is_unlocked = True
+            return
+        
         progress = UserSkillProgress(
             user_id=user_id,
             topic_id=topic_id,
@@ -149,9 +166,22 @@ class RecursiveSubtopicGenerator:
             mastery_level="novice"
         )
         db.add(progress)
+        cache[topic_id] = progress
+    
+    def _prepare_name_features(self):
+        """Tokenize every topic name once so the analyzers below can share the work"""
+        for node in self.tree_data.values():
+            name_lower = node['name'].lower()
+            node['_nl'] = name_lower
+            node['_words'] = tuple(node['name'].split())
+            node['_sig'] = frozenset(name_lower.split()) - STOPWORDS
+            node['_general'] = any(term in name_lower for term in GENERAL_TERMS)
+            node['_basic'] = any(term in name_lower for term in BASIC_TERMS)
     
     def analyze_tree_structure(self):
         """Analyze the generated tree for MECE violations and structure"""
+        self._prepare_name_features()
+        
         print("\n" + "="*80)
         print("TREE STRUCTURE ANALYSIS")
         print("="*80)
@@ -188,14 +218,14 @@ class RecursiveSubtopicGenerator:
         parent_groups = defaultdict(list)
         for node_id, node in self.tree_data.items():
             if node['parent_id']:
-                parent_groups[node['parent_id']].append((node_id, node['name']))
+                parent_groups[node['parent_id']].append(node)
         
         # Check each sibling group
         for parent_id, siblings in parent_groups.items():
             parent_name = self.tree_data.get(parent_id, {}).get('name', 'Unknown')
             
             # Check for duplicate names
-            names = [name.lower() for _, name in siblings]
+            names = [node['_nl'] for node in siblings]
             name_counts = Counter(names)
             for name, count in name_counts.items():
                 if count > 1:
@@ -206,14 +236,14 @@ class RecursiveSubtopicGenerator:
                     })
             
             # Check for overlapping concepts
-            for i, (id1, name1) in enumerate(siblings):
-                for id2, name2 in siblings[i+1:]:
-                    overlap = self._check_conceptual_overlap(name1, name2)
+            for i, node1 in enumerate(siblings):
+                for node2 in siblings[i+1:]:
+                    overlap = self._check_conceptual_overlap(node1, node2)
                     if overlap:
                         violations.append({
                             'type': 'overlap',
                             'parent': parent_name,
-                            'issue': f"'{name1}' and '{name2}' have conceptual overlap: {overlap}"
+                            'issue': f"'{node1['name']}' and '{node2['name']}' have conceptual overlap: {overlap}"
                         })
             
             # Check for completeness (heuristic)
@@ -235,20 +265,17 @@ class RecursiveSubtopicGenerator:
         else:
             print("✅ No MECE violations detected!")
     
-    def _check_conceptual_overlap(self, name1: str, name2: str) -> str:
+    def _check_conceptual_overlap(self, node1: Dict, node2: Dict) -> str:
         """Check if two topic names have conceptual overlap"""
-        name1_lower = name1.lower()
-        name2_lower = name2.lower()
+        name1_lower = node1['_nl']
+        name2_lower = node2['_nl']
         
         # Check for subset relationships
         if name1_lower in name2_lower or name2_lower in name1_lower:
             return "subset relationship"
         
         # Check for common significant words
-        words1 = set(name1_lower.split()) - {'of', 'and', 'the', 'in', 'for', 'with', 'to', 'a', 'an'}
-        words2 = set(name2_lower.split()) - {'of', 'and', 'the', 'in', 'for', 'with', 'to', 'a', 'an'}
-        
-        common_words = words1 & words2
+        common_words = node1['_sig'] & node2['_sig']
         if len(common_words) >= 2:
             return f"share words: {', '.join(common_words)}"
         
@@ -275,15 +302,13 @@ class RecursiveSubtopicGenerator:
         """Analyze naming patterns in the tree"""
         print(f"\n📝 NAMING PATTERN ANALYSIS:")
         
-        all_names = [node['name'] for node in self.tree_data.values()]
-        
         # Common prefixes/suffixes
         prefixes = Counter()
         suffixes = Counter()
         word_frequency = Counter()
         
-        for name in all_names:
-            words = name.split()
+        for node in self.tree_data.values():
+            words = node['_words']
             if words:
                 prefixes[words[0]] += 1
                 suffixes[words[-1]] += 1
@@ -299,7 +324,7 @@ class RecursiveSubtopicGenerator:
         
         print("\nMost frequent words overall:")
         for word, count in word_frequency.most_common(15):
-            if word.lower() not in {'of', 'and', 'the', 'in', 'for', 'with', 'to', 'a', 'an'}:
+            if word.lower() not in STOPWORDS:
                 print(f"  - '{word}': {count} times")
     
     def _check_logical_hierarchy(self):
@@ -313,11 +338,11 @@ class RecursiveSubtopicGenerator:
                 parent = self.tree_data.get(node['parent_id'])
                 if parent:
                     # Check if child is more general than parent
-                    if self._is_more_general(node['name'], parent['name']):
+                    if self._is_more_general(node, parent):
                         issues.append(f"'{node['name']}' seems more general than parent '{parent['name']}'")
                     
                     # Check depth appropriateness
-                    if node['depth'] > 3 and any(word in node['name'].lower() for word in ['introduction', 'basics', 'fundamentals', 'overview']):
+                    if node['depth'] > 3 and node['_basic']:
                         issues.append(f"Basic topic '{node['name']}' at depth {node['depth']} - should be higher")
         
         if issues:
@@ -329,21 +354,14 @@ class RecursiveSubtopicGenerator:
         else:
             print("✅ Hierarchy appears logically structured!")
     
-    def _is_more_general(self, child_name: str, parent_name: str) -> bool:
+    def _is_more_general(self, child: Dict, parent: Dict) -> bool:
         """Check if child topic is more general than parent"""
-        child_lower = child_name.lower()
-        parent_lower = parent_name.lower()
-        
         # Check if parent name is contained in child (usually means child is more specific)
-        if parent_lower in child_lower:
+        if parent['_nl'] in child['_nl']:
             return False
         
         # Check for general terms in child
-        general_terms = ['general', 'overview', 'introduction', 'all', 'complete', 'comprehensive']
-        child_has_general = any(term in child_lower for term in general_terms)
-        parent_has_general = any(term in parent_lower for term in general_terms)
-        
-        return child_has_general and not parent_has_general
+        return child['_general'] and not parent['_general']
     
     def _visualize_tree_sample(self):
         """Create a sample visualization of part of the tree"""
@@ -384,7 +402,10 @@ class RecursiveSubtopicGenerator:
                     'generation_log': self.generation_log,
                     'mece_violations': self.mece_violations
                 },
-                'tree_data': self.tree_data
+                'tree_data': {
+                    node_id: {k: v for k, v in node.items() if not k.startswith('_')}
+                    for node_id, node in self.tree_data.items()
+                }
             }, f, indent=2)
         
         print(f"\n💾 Results saved to recursive_generation_log_{timestamp}.json")
@@ -438,26 +459,27 @@ async def main():
         print(f"\n⏱️ Generation completed in {generation_time:.2f} seconds")
         print(f"📊 Total subtopics generated: {generator.generated_count}")
         
-        # Load full tree from database for analysis
-        all_topics_result = await db.execute(select(Topic))
-        all_topics = all_topics_result.scalars().all()
-        
-        print(f"📊 Total topics in database: {len(all_topics)}")
-        
-        # Rebuild tree data with all topics
+        # Load full tree from database for analysis. Only the columns the
+        # analysis needs are selected and rows are streamed in batches, so no
+        # ORM objects are built for the whole topic table.
         generator.tree_data = {}
-        for topic in all_topics:
-            generator.tree_data[topic.id] = {
-                'name': topic.name,
+        topic_rows = await db.stream(
+            select(Topic.id, Topic.name, Topic.parent_id).execution_options(yield_per=1000)
+        )
+        async for topic_id, name, parent_id in topic_rows:
+            generator.tree_data[topic_id] = {
+                'name': name,
                 'depth': 0,  # Will calculate
                 'children': [],
-                'parent_id': topic.parent_id
+                'parent_id': parent_id
             }
         
-        # Calculate depths and children
-        for topic in all_topics:
-            if topic.parent_id and topic.parent_id in generator.tree_data:
-                generator.tree_data[topic.parent_id]['children'].append(topic.id)
+        print(f"📊 Total topics in database: {len(generator.tree_data)}")
+        
+        # Calculate children
+        for topic_id, node in generator.tree_data.items():
+            if node['parent_id'] and node['parent_id'] in generator.tree_data:
+                generator.tree_data[node['parent_id']]['children'].append(topic_id)
         
         # Calculate depths
         def calculate_depth(topic_id, depth=0):
@@ -467,13 +489,13 @@ async def main():
         
         calculate_depth(ai_topic.id)
         
-        # Analyze the tree
-        generator.analyze_tree_structure()
-        
-        # Save results
-        generator.save_results()
-        
-        print("\n✅ Test completed!")
+    # Analyze the tree (fully loaded, so the session is already closed)
+    generator.analyze_tree_structure()
+    
+    # Save results
+    generator.save_results()
+    
+    print("\n✅ Test completed!")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,27 @@
+"""
+Event loop entry point shared by the integration test scripts
+"""
+import asyncio
+import sys
+import traceback
+
+try:
+    import uvloop
+except ImportError:  # uvloop does not support Windows
+    uvloop = None
+
+
+def run(main):
+    """Run a test coroutine to completion on a uvloop event loop where available
+
+    A failure prints its traceback (for an exception group, every
+    sub-exception) and exits non-zero; under pytest the tests are awaited
+    directly instead, so the exception fails the test
+    """
+    loop_factory = uvloop.new_event_loop if uvloop else None
+    try:
+        with asyncio.Runner(loop_factory=loop_factory) as runner:
+            return runner.run(main)
+    except Exception as e:
+        traceback.print_exception(e)
+        sys.exit(1)
@@ -0,0 +1,102 @@
+"""
+Pytest fixtures shared by the integration test scripts
+"""
+import asyncio
+import os
+import sys
+from pathlib import Path
+import pytest
+import pytest_asyncio
+from pytest_asyncio import is_async_test
+
+from http_client import create_client
+from _runner import uvloop
+
+# Add the backend directory to the path for the database reset
+sys.path.append(str(Path(__file__).parent.parent.parent))
+
+# test_direct_unlock drives the database directly and forces the root unlock,
+# which would break every later check on the initial state; run it by hand
+collect_ignore = ["test_direct_unlock.py"]
+
+
+def pytest_collection_modifyitems(items):
+    """Run every async test on one session-wide event loop so the client can be shared"""
+    session_loop = pytest.mark.asyncio(loop_scope="session")
+    for item in items:
+        if is_async_test(item):
+            item.add_marker(session_loop, append=False)
+
+
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    """Use uvloop where available, matching the scripts' own entry points"""
+    return uvloop.EventLoopPolicy() if uvloop else asyncio.DefaultEventLoopPolicy()
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def client():
+    """One pooled HTTP client reused by every integration test"""
+    async with create_client() as client:
+        yield client
+
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def minimal_ontology():
+    """Reset the database to the minimal ontology (just the AI root topic,
+    unlocked for user 1 with no progress) before a test that starts from it.
+
+    This deletes data, so it only runs with RELEVIA_TEST_RESET_DB=1; the quiz
+    history removed is user 1's, and deleting a subtopic another user has
+    data on fails instead of removing that data"""
+    if os.environ.get("RELEVIA_TEST_RESET_DB") != "1":
+        pytest.skip("needs a fresh ontology; set RELEVIA_TEST_RESET_DB=1 to reset the test database")
+    
+    # Imported here so collecting the HTTP-only tests needs no DATABASE_URL
+    from sqlalchemy import delete, select, update
+    from db.database import AsyncSessionLocal
+    from db.models import (
+        DynamicTopicUnlock, Question, QuizQuestion, QuizSession, Topic,
+        TopicPrerequisite, TopicQuestionHistory, UserInterest, UserSkillProgress
+    )
+    
+    user_id = 1
+    subtopic_ids = select(Topic.id).where(Topic.parent_id.is_not(None))
+    session_ids = select(QuizSession.id).where(QuizSession.user_id == user_id)
+    async with AsyncSessionLocal() as session:
+        # Quiz history references questions and sessions, so it goes first
+        await session.execute(delete(TopicQuestionHistory).where(TopicQuestionHistory.user_id == user_id))
+        await session.execute(delete(QuizQuestion).where(QuizQuestion.quiz_session_id.in_(session_ids)))
+        await session.execute(delete(QuizSession).where(QuizSession.user_id == user_id))
+        await session.execute(delete(DynamicTopicUnlock).where(DynamicTopicUnlock.user_id == user_id))
+        for model in (UserInterest, UserSkillProgress):
+            await session.execute(
+                delete(model).where(model.user_id == user_id).where(model.topic_id.in_(subtopic_ids))
+            )
+        
+        # The generated subtopics and their questions
+        await session.execute(delete(Question).where(Question.topic_id.in_(subtopic_ids)))
+        await session.execute(
+            delete(TopicPrerequisite).where(
+                TopicPrerequisite.topic_id.in_(subtopic_ids)
+                | TopicPrerequisite.prerequisite_id.in_(subtopic_ids)
+            )
+        )
+        await session.execute(delete(Topic).where(Topic.parent_id.is_not(None)))
+        
+        await session.execute(
+            update(UserSkillProgress)
+            .where(UserSkillProgress.user_id == user_id)
+            .values(
+                questions_answered=0,
+                correct_answers=0,
+                skill_level=0.5,
+                confidence=0.5,
+                mastery_level="novice",
+                current_mastery_level="novice",
+                mastery_questions_answered={"novice": 0, "competent": 0, "proficient": 0, "expert": 0, "master": 0},
+                is_unlocked=True,
+                proficiency_threshold_met=False
+            )
+        )
+        await session.commit()
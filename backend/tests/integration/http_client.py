@@ -0,0 +1,48 @@
+"""
+Shared HTTP client settings for the integration test scripts
+"""
+import os
+import httpx
+from httpx_aiohttp import AiohttpTransport
+
+API_BASE_URL = "http://localhost:8000/api/v1"
+
+# Request bodies are pre-encoded with orjson and sent as raw content
+JSON_HEADERS = {"content-type": "application/json"}
+
+# uvicorn only speaks HTTP/1.1; set RELEVIA_TEST_HTTP2=1 when the backend runs
+# under an h2c-capable server (e.g. hypercorn) to multiplex requests instead
+USE_HTTP2 = os.environ.get("RELEVIA_TEST_HTTP2") == "1"
+
+
+def create_client(
+    base_url: str = API_BASE_URL,
+    *,
+    trust_env: bool = True,
+    verify: bool = True,
+    keepalive_expiry: float = 15.0,
+    timeout: httpx.Timeout = httpx.Timeout(30.0)
+) -> httpx.AsyncClient:
+    """Create an AsyncClient that sends requests over a pooled aiohttp transport,
+    or over a single multiplexed HTTP/2 connection when USE_HTTP2 is set.
+
+    A plain-HTTP loopback backend can pass trust_env=False and verify=False to
+    skip the proxy lookup from the environment and loading the CA bundle"""
+    limits = httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=keepalive_expiry)
+    if USE_HTTP2:
+        # Plain-HTTP HTTP/2 needs prior knowledge, so HTTP/1.1 is disabled
+        return httpx.AsyncClient(
+            base_url=base_url,
+            http1=False,
+            http2=True,
+            trust_env=trust_env,
+            verify=verify,
+            limits=limits,
+            timeout=timeout
+        )
+    return httpx.AsyncClient(
+        base_url=base_url,
+        trust_env=trust_env,
+        transport=AiohttpTransport(trust_env=trust_env, verify=verify, limits=limits),
+        timeout=timeout
+    )
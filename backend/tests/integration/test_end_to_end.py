@@ -4,61 +4,66 @@ End-to-end integration test for the dynamic ontology system
 import asyncio
 import sys
 from pathlib import Path
-import httpx
-import json
+import orjson
+import pytest
 
 # Add parent directory to path
 sys.path.append(str(Path(__file__).parent.parent.parent))
 
+from http_client import JSON_HEADERS, create_client
+from _runner import run
+
 class EndToEndTest:
     def __init__(self, base_url="http://localhost:8000"):
         self.base_url = base_url
         self.api_base = f"{base_url}/api/v1"
         self.user_id = 1
+        self._progress_cache = None
         
-    async def run_full_test(self):
+    async def run_full_test(self, client):
         """Run complete end-to-end test"""
         print("🚀 Starting End-to-End Test")
         print("=" * 50)
         
-        try:
-            async with httpx.AsyncClient() as client:
-                # Test 1: Health check
-                await self.test_health_check(client)
-                
-                # Test 2: Check initial state
-                await self.test_initial_state(client)
-                
-                # Test 3: Start a quiz
-                session = await self.test_start_quiz(client)
-                
-                # Test 4: Get and answer questions
-                await self.test_quiz_flow(client, session)
-                
-                # Test 5: Check for dynamic topic generation
-                await self.test_dynamic_generation(client)
-                
-                # Test 6: Test interest tracking with Teach Me/Skip
-                await self.test_interest_tracking(client)
-                
-                # Test 7: Test personalization endpoints
-                await self.test_personalization(client)
-                
-                print("\n🎉 All tests passed! The dynamic ontology system is working correctly.")
-                
-        except Exception as e:
-            print(f"\n❌ Test failed: {e}")
-            import traceback
-            traceback.print_exc()
+        # Test 1: Health check
+        await self.test_health_check(client)
+        
+        # Test 2: Check initial state
+        ai_topic = await self.test_initial_state(client)
+        
+        # Test 3: Start a quiz
+        session = await self.test_start_quiz(client, ai_topic)
+        
+        # Test 4: Get and answer questions
+        await self.test_quiz_flow(client, session)
+        
+        # Test 5: Check for dynamic topic generation
+        await self.test_dynamic_generation(client)
+        
+        # Test 6: Test interest tracking with Teach Me/Skip
+        await self.test_interest_tracking(client)
+        
+        # Test 7: Test personalization endpoints
+        await self.test_personalization(client)
+        
+        print("\n🎉 All tests passed! The dynamic ontology system is working correctly.")
+    
+    async def _get_progress(self, client):
+        """Fetch user progress, reusing the last response until an answer invalidates it"""
+        if self._progress_cache is None:
+            response = await client.get(f"/personalization/progress/{self.user_id}")
+            assert response.status_code == 200, f"Progress check failed: {response.status_code}"
+            self._progress_cache = orjson.loads(response.content)
+        return self._progress_cache
     
     async def test_health_check(self, client):
         """Test that the backend is running"""
         print("\n🏥 Testing health check...")
         
-        response = await client.get(f"{self.api_base}/health")
+        response = await client.get("/health")
         assert response.status_code == 200, f"Health check failed: {response.status_code}"
         
-        data = response.json()
+        data = orjson.loads(response.content)
         assert data["status"] == "healthy", f"Service not healthy: {data}"
         
         print("✅ Health check passed")
@@ -68,10 +73,7 @@ class EndToEndTest:
         print("\n🌱 Testing initial state...")
         
         # Check user progress
-        response = await client.get(f"{self.api_base}/personalization/progress/{self.user_id}")
-        assert response.status_code == 200, f"Progress check failed: {response.status_code}"
-        
-        progress_data = response.json()
+        progress_data = await self._get_progress(client)
         progress_list = progress_data["progress"]
         
         # Should have exactly one topic: Artificial Intelligence
@@ -84,13 +86,10 @@ class EndToEndTest:
         print(f"✅ Initial state correct: {ai_topic['name']} unlocked")
         return ai_topic
     
-    async def test_start_quiz(self, client):
-        """Test starting a quiz"""
+    async def test_start_quiz(self, client, ai_topic):
+        """Test starting a quiz on the topic found by test_initial_state"""
         print("\n📝 Testing quiz start...")
         
-        # Get the AI topic ID first
-        response = await client.get(f"{self.api_base}/personalization/progress/{self.user_id}")
-        ai_topic = response.json()["progress"][0]["topic"]
         topic_id = ai_topic["id"]
         
         # Start a quiz
@@ -99,10 +98,10 @@ class EndToEndTest:
             "user_id": self.user_id
         }
         
-        response = await client.post(f"{self.api_base}/quiz/start", json=quiz_data)
+        response = await client.post("/quiz/start", content=orjson.dumps(quiz_data), headers=JSON_HEADERS)
         assert response.status_code == 200, f"Quiz start failed: {response.status_code} - {response.text}"
         
-        session_data = response.json()
+        session_data = orjson.loads(response.content)
         assert "session_id" in session_data, "No session_id in response"
         assert session_data["topic_id"] == topic_id, "Topic ID mismatch"
         
@@ -114,19 +113,20 @@ class EndToEndTest:
         print("\n❓ Testing quiz flow...")
         
         session_id = session["session_id"]
+        question_url = f"/quiz/question/{session_id}"
         questions_answered = 0
         correct_answers = 0
         
         # Answer several questions to build proficiency
         for i in range(8):
             # Get a question
-            response = await client.get(f"{self.api_base}/quiz/question/{session_id}")
+            response = await client.get(question_url)
             
             if response.status_code != 200:
                 print(f"⚠️  Could not get question {i+1}: {response.status_code}")
                 break
                 
-            question_data = response.json()
+            question_data = orjson.loads(response.content)
             assert "quiz_question_id" in question_data, "No quiz_question_id in question"
             assert "options" in question_data, "No options in question"
             
@@ -143,10 +143,11 @@ class EndToEndTest:
                 "action": "answer"
             }
             
-            response = await client.post(f"{self.api_base}/quiz/answer", json=answer_data)
+            response = await client.post("/quiz/answer", content=orjson.dumps(answer_data), headers=JSON_HEADERS)
             assert response.status_code == 200, f"Answer submission failed: {response.status_code}"
+            self._progress_cache = None
             
-            result = response.json()
+            result = orjson.loads(response.content)
             questions_answered += 1
             if result.get("correct", False):
                 correct_answers += 1
@@ -167,10 +168,7 @@ class EndToEndTest:
         print("\n🌲 Testing dynamic topic generation...")
         
         # Check user progress again
-        response = await client.get(f"{self.api_base}/personalization/progress/{self.user_id}")
-        assert response.status_code == 200
-        
-        progress_data = response.json()
+        progress_data = await self._get_progress(client)
         progress_list = progress_data["progress"]
         
         # Should now have more than one topic if generation worked
@@ -190,8 +188,8 @@ class EndToEndTest:
         print("\n💡 Testing interest tracking...")
         
         # Get current progress to find an unlocked topic
-        response = await client.get(f"{self.api_base}/personalization/progress/{self.user_id}")
-        progress_list = response.json()["progress"]
+        progress_data = await self._get_progress(client)
+        progress_list = progress_data["progress"]
         
         # Find an unlocked topic
         unlocked_topic = None
@@ -210,20 +208,20 @@ class EndToEndTest:
             "user_id": self.user_id
         }
         
-        response = await client.post(f"{self.api_base}/quiz/start", json=quiz_data)
+        response = await client.post("/quiz/start", content=orjson.dumps(quiz_data), headers=JSON_HEADERS)
         if response.status_code != 200:
             print(f"⚠️  Could not start quiz for interest testing: {response.status_code}")
             return
             
-        session_id = response.json()["session_id"]
+        session_id = orjson.loads(response.content)["session_id"]
         
         # Get a question
-        response = await client.get(f"{self.api_base}/quiz/question/{session_id}")
+        response = await client.get(f"/quiz/question/{session_id}")
         if response.status_code != 200:
             print(f"⚠️  Could not get question for interest testing: {response.status_code}")
             return
         
-        question_data = response.json()
+        question_data = orjson.loads(response.content)
         quiz_question_id = question_data["quiz_question_id"]
         
         # Test "Teach Me" action
@@ -234,15 +232,20 @@ class EndToEndTest:
             "action": "teach_me"
         }
         
-        response = await client.post(f"{self.api_base}/quiz/answer", json=teach_me_data)
+        # The first question is already recorded for the session, so the
+        # question for the Skip test can be fetched while Teach Me is submitted
+        response, next_response = await asyncio.gather(
+            client.post("/quiz/answer", content=orjson.dumps(teach_me_data), headers=JSON_HEADERS),
+            client.get(f"/quiz/question/{session_id}")
+        )
         assert response.status_code == 200, f"Teach Me action failed: {response.status_code}"
+        self._progress_cache = None
         
         print("✅ 'Teach Me' action successful")
         
-        # Get another question for Skip test
-        response = await client.get(f"{self.api_base}/quiz/question/{session_id}")
-        if response.status_code == 200:
-            question_data = response.json()
+        # Use the other question for Skip test
+        if next_response.status_code == 200:
+            question_data = orjson.loads(next_response.content)
             quiz_question_id = question_data["quiz_question_id"]
             
             # Test "Skip" action
@@ -253,8 +256,9 @@ class EndToEndTest:
                 "action": "skip"
             }
             
-            response = await client.post(f"{self.api_base}/quiz/answer", json=skip_data)
+            response = await client.post("/quiz/answer", content=orjson.dumps(skip_data), headers=JSON_HEADERS)
             assert response.status_code == 200, f"Skip action failed: {response.status_code}"
+            self._progress_cache = None
             
             print("✅ 'Skip' action successful")
     
@@ -262,31 +266,41 @@ class EndToEndTest:
         """Test personalization endpoints"""
         print("\n🎯 Testing personalization endpoints...")
         
+        # The three endpoints are independent, so fetch them concurrently
+        interests_response, recommendations_response, ontology_response = await asyncio.gather(
+            client.get(f"/personalization/interests/{self.user_id}"),
+            client.get(f"/personalization/recommendations/{self.user_id}"),
+            client.get(f"/personalization/ontology/{self.user_id}")
+        )
+        
         # Test user interests
-        response = await client.get(f"{self.api_base}/personalization/interests/{self.user_id}")
-        assert response.status_code == 200, f"Interests endpoint failed: {response.status_code}"
+        assert interests_response.status_code == 200, f"Interests endpoint failed: {interests_response.status_code}"
         
-        interests = response.json()["interests"]
+        interests = orjson.loads(interests_response.content)["interests"]
         print(f"✅ User interests retrieved: {len(interests)} interests")
         
         # Test recommendations
-        response = await client.get(f"{self.api_base}/personalization/recommendations/{self.user_id}")
-        assert response.status_code == 200, f"Recommendations endpoint failed: {response.status_code}"
+        assert recommendations_response.status_code == 200, f"Recommendations endpoint failed: {recommendations_response.status_code}"
         
-        recommendations = response.json()["recommendations"]
+        recommendations = orjson.loads(recommendations_response.content)["recommendations"]
         print(f"✅ Recommendations retrieved: {len(recommendations)} recommendations")
         
         # Test personalized ontology
-        response = await client.get(f"{self.api_base}/personalization/ontology/{self.user_id}")
-        assert response.status_code == 200, f"Personalized ontology failed: {response.status_code}"
+        assert ontology_response.status_code == 200, f"Personalized ontology failed: {ontology_response.status_code}"
         
-        ontology = response.json()["topics"]
+        ontology = orjson.loads(ontology_response.content)["topics"]
         print(f"✅ Personalized ontology retrieved: {len(ontology)} topics")
 
+@pytest.mark.usefixtures("minimal_ontology")
+async def test_end_to_end(client):
+    """Run the end-to-end test with the client shared by the pytest session"""
+    await EndToEndTest().run_full_test(client)
+
 async def main():
     """Run the end-to-end test"""
     test = EndToEndTest()
-    await test.run_full_test()
+    async with create_client(test.api_base) as client:
+        await test.run_full_test(client)
 
 if __name__ == "__main__":
-    asyncio.run(main())
\ No newline at end of file
+    run(main())
\ No newline at end of file
@@ -1,76 +1,78 @@
 """
 Test that question counter increments correctly for all actions
 """
-import asyncio
-import httpx
+import orjson
+from http_client import JSON_HEADERS, create_client
+from _runner import run
 
-async def test_question_counter():
+# Answer submitted for each action; Teach Me and Skip send an empty answer
+ANSWER_FOR_ACTION = {
+    "answer": lambda question: question["options"][0],
+    "teach_me": lambda question: "",
+    "skip": lambda question: ""
+}
+
+# Test different actions and track question flow
+ACTIONS_TO_TEST = ("answer", "teach_me", "skip", "answer")
+
+async def test_question_counter(client):
     """Test that question numbering works correctly"""
     print("🔢 Testing Question Counter Fix")
     print("=" * 40)
     
-    base_url = "http://localhost:8000/api/v1"
+    # Get a topic and start quiz
+    response = await client.get("/personalization/progress/1")
+    topic = orjson.loads(response.content)["progress"][0]["topic"]
+    
+    quiz_data = {"topic_id": topic["id"], "user_id": 1}
+    response = await client.post("/quiz/start", content=orjson.dumps(quiz_data), headers=JSON_HEADERS)
+    session_id = orjson.loads(response.content)["session_id"]
+    question_path = f"/quiz/question/{session_id}"
+    
+    print(f"✅ Started quiz session: {session_id}")
     
-    async with httpx.AsyncClient() as client:
-        try:
-            # Get a topic and start quiz
-            response = await client.get(f"{base_url}/personalization/progress/1")
-            topic = response.json()["progress"][0]["topic"]
-            
-            quiz_data = {"topic_id": topic["id"], "user_id": 1}
-            response = await client.post(f"{base_url}/quiz/start", json=quiz_data)
-            session_id = response.json()["session_id"]
-            
-            print(f"✅ Started quiz session: {session_id}")
-            
-            # Test different actions and track question flow
-            actions_to_test = [
-                ("answer", "First option"),
-                ("teach_me", ""),
-                ("skip", ""),
-                ("answer", "First option")
-            ]
-            
-            for i, (action, answer) in enumerate(actions_to_test, 1):
-                # Get question
-                response = await client.get(f"{base_url}/quiz/question/{session_id}")
-                if response.status_code != 200:
-                    print(f"❌ Failed to get question {i}")
-                    break
-                    
-                question = response.json()
-                print(f"📝 Question {i}: {question['question'][:50]}...")
-                
-                # Submit action
-                action_data = {
-                    "quiz_question_id": question["quiz_question_id"],
-                    "answer": answer if answer else (question["options"][0] if action == "answer" else ""),
-                    "time_spent": 5,
-                    "action": action
-                }
-                
-                response = await client.post(f"{base_url}/quiz/answer", json=action_data)
-                if response.status_code != 200:
-                    print(f"❌ Failed to submit {action} for question {i}")
-                    break
-                    
-                result = response.json()
-                print(f"✅ {action.title()} action successful for question {i}")
-                
-                # Check if we got session progress
-                if "session_progress" in result:
-                    progress = result["session_progress"]
-                    print(f"   📊 Session: {progress['correct_answers']}/{progress['total_questions']} questions")
-            
-            print(f"\n🎉 Question counter test completed!")
-            print(f"✅ Each action should show as a new question number in the frontend")
-            print(f"✅ Backend properly tracks which questions were asked")
-            print(f"✅ No duplicate questions should appear in the same session")
-            
-        except Exception as e:
-            print(f"\n❌ Test failed: {e}")
-            import traceback
-            traceback.print_exc()
+    # Every action must move the session on to a question not asked before
+    # (quiz_question_id is new on every fetch, so the question_id is checked)
+    seen_question_ids = set()
+    
+    for i, action in enumerate(ACTIONS_TO_TEST, 1):
+        # Get question
+        response = await client.get(question_path)
+        assert response.status_code == 200, f"Failed to get question {i}: {response.status_code}"
+        
+        question = orjson.loads(response.content)
+        assert question["question_id"] not in seen_question_ids, f"Question {i} repeats an earlier question"
+        seen_question_ids.add(question["question_id"])
+        print(f"📝 Question {i}: {question['question'][:50]}...")
+        
+        # Submit action
+        action_data = {
+            "quiz_question_id": question["quiz_question_id"],
+            "answer": ANSWER_FOR_ACTION[action](question),
+            "time_spent": 5,
+            "action": action
+        }
+        
+        response = await client.post("/quiz/answer", content=orjson.dumps(action_data), headers=JSON_HEADERS)
+        assert response.status_code == 200, f"Failed to submit {action} for question {i}: {response.status_code}"
+        
+        result = orjson.loads(response.content)
+        print(f"✅ {action.title()} action successful for question {i}")
+        
+        # Check if we got session progress
+        if "session_progress" in result:
+            progress = result["session_progress"]
+            print(f"   📊 Session: {progress['correct_answers']}/{progress['total_questions']} questions")
+    
+    print(f"\n🎉 Question counter test completed!")
+    print(f"✅ Each action should show as a new question number in the frontend")
+    print(f"✅ Backend properly tracks which questions were asked")
+    print(f"✅ No duplicate questions should appear in the same session")
+
+async def main():
+    """Run the test against the local backend"""
+    async with create_client() as client:
+        await test_question_counter(client)
 
 if __name__ == "__main__":
-    asyncio.run(test_question_counter())
\ No newline at end of file
+    run(main())
\ No newline at end of file
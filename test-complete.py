@@ -2,11 +2,19 @@
 Complete end-to-end test of the Spark application
 """
 import asyncio
-import httpx
-import json
+import sys
+import traceback
+import orjson
+from collections import deque
 from datetime import datetime
+from pathlib import Path
+from statistics import fmean
 
-BASE_URL = "http://localhost:8000/api/v1"
+# Share the client settings of the backend integration tests
+sys.path.append(str(Path(__file__).parent / "backend" / "tests" / "integration"))
+
+from http_client import JSON_HEADERS, create_client
+from _runner import run
 
 async def complete_system_test():
     """Comprehensive test of all system components"""
@@ -14,7 +22,8 @@ async def complete_system_test():
     print("=" * 60)
     print(f"⏰ Started at: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
     
-    async with httpx.AsyncClient(timeout=30.0) as client:
+    # One pooled client for every step, so connections are kept alive and reused
+    async with create_client() as client:
         test_results = {
             "health": False,
             "topics": False,
@@ -28,9 +37,9 @@ async def complete_system_test():
         try:
             # Test 1: System Health
             print(f"\n{'='*20} 1. SYSTEM HEALTH {'='*20}")
-            response = await client.get(f"{BASE_URL}/health")
+            response = await client.get("/health")
             if response.status_code == 200:
-                health_data = response.json()
+                health_data = orjson.loads(response.content)
                 print(f"✅ Backend Health: {health_data['status']}")
                 print(f"📊 Service: {health_data['service']}")
                 test_results["health"] = True
@@ -41,27 +50,30 @@ async def complete_system_test():
             # Test 2: Topic System
             print(f"\n{'='*20} 2. TOPIC SYSTEM {'='*20}")
             
+            # The hierarchy and flat endpoints are independent, so request both at once
+            response, flat_response = await asyncio.gather(
+                client.get("/topics/"),
+                client.get("/topics/flat")
+            )
+            
             # Test hierarchy endpoint
-            response = await client.get(f"{BASE_URL}/topics/")
             if response.status_code == 200:
-                hierarchy = response.json()
+                hierarchy = orjson.loads(response.content)
                 print(f"✅ Topic hierarchy loaded: {len(hierarchy['topics'])} root topics")
                 
                 # Test flat endpoint
-                response = await client.get(f"{BASE_URL}/topics/flat")
-                if response.status_code == 200:
-                    flat_topics = response.json()
+                if flat_response.status_code == 200:
+                    flat_topics = orjson.loads(flat_response.content)
                     total_topics = len(flat_topics['topics'])
                     print(f"✅ Flat topics loaded: {total_topics} total topics")
                     
                     # Analyze topic distribution
-                    difficulties = [t['difficulty_max'] for t in flat_topics['topics']]
-                    avg_difficulty = sum(difficulties) / len(difficulties)
+                    avg_difficulty = fmean(t['difficulty_max'] for t in flat_topics['topics'])
                     print(f"📈 Average difficulty: {avg_difficulty:.1f}/10")
                     
                     test_results["topics"] = True
                 else:
-                    print(f"❌ Flat topics failed: {response.status_code}")
+                    print(f"❌ Flat topics failed: {flat_response.status_code}")
                     return test_results
             else:
                 print(f"❌ Topic hierarchy failed: {response.status_code}")
@@ -78,36 +90,56 @@ async def complete_system_test():
                 if len(test_topics) >= 3:  # Test with 3 different topics
                     break
             
+            # Sessions for different topics are independent, so start them concurrently
+            responses = await asyncio.gather(*[
+                client.post(
+                    "/quiz/start",
+                    content=orjson.dumps({"topic_id": topic['id'], "user_id": 1}),
+                    headers=JSON_HEADERS
+                )
+                for topic in test_topics
+            ])
+            
             quiz_sessions = []
-            for i, topic in enumerate(test_topics):
+            for topic, response in zip(test_topics, responses):
                 print(f"\n🧪 Testing with topic: {topic['name']} (Difficulty: {topic['difficulty_min']}-{topic['difficulty_max']})")
                 
-                # Start quiz
-                quiz_data = {"topic_id": topic['id'], "user_id": 1}
-                response = await client.post(f"{BASE_URL}/quiz/start", json=quiz_data)
-                
                 if response.status_code == 200:
-                    session = response.json()
+                    session = orjson.loads(response.content)
                     quiz_sessions.append((session, topic))
                     print(f"✅ Quiz session {session['session_id']} created")
                     test_results["quiz_creation"] = True
                 else:
                     print(f"❌ Quiz creation failed: {response.status_code}")
-                    print(await response.text())
+                    print(response.text)
                     return test_results
             
             # Test 4: Question Generation Quality
             print(f"\n{'='*20} 4. QUESTION GENERATION {'='*20}")
             
+            async def fetch_session_questions(session_id):
+                """Fetch up to 3 questions for one session, stopping at the first failure"""
+                responses = []
+                for _ in range(3):
+                    response = await client.get(f"/quiz/question/{session_id}")
+                    responses.append(response)
+                    if response.status_code != 200:
+                        break
+                return responses
+            
+            # Questions within a session are fetched in order so the backend can
+            # avoid repeats; different sessions are fetched concurrently
+            session_responses = await asyncio.gather(*[
+                fetch_session_questions(session_data['session_id'])
+                for session_data, _ in quiz_sessions
+            ])
+            
             generated_questions = []
-            for session_data, topic in quiz_sessions:
-                session_id = session_data['session_id']
-                
+            for (session_data, topic), responses in zip(quiz_sessions, session_responses):
                 # Generate multiple questions to test variety
-                for q_num in range(3):
-                    response = await client.get(f"{BASE_URL}/quiz/question/{session_id}")
+                for q_num, response in enumerate(responses):
                     if response.status_code == 200:
-                        question = response.json()
+                        question = orjson.loads(response.content)
                         generated_questions.append(question)
                         
                         print(f"📝 Q{q_num+1} for {topic['name'][:20]}...")
@@ -120,7 +152,6 @@ async def complete_system_test():
                             test_results["question_generation"] = True
                     else:
                         print(f"❌ Question generation failed: {response.status_code}")
-                        break
             
             # Test 5: Answer Submission & Feedback
             print(f"\n{'='*20} 5. ANSWER PROCESSING {'='*20}")
@@ -136,9 +167,9 @@ async def complete_system_test():
                     "time_spent": 10 + i * 5
                 }
                 
-                response = await client.post(f"{BASE_URL}/quiz/answer", json=answer_data)
+                response = await client.post("/quiz/answer", content=orjson.dumps(answer_data), headers=JSON_HEADERS)
                 if response.status_code == 200:
-                    feedback = response.json()
+                    feedback = orjson.loads(response.content)
                     feedback_samples.append(feedback)
                     
                     status = "✅" if feedback['correct'] else "❌"
@@ -156,23 +187,27 @@ async def complete_system_test():
             
             if feedback_samples:
                 # Analyze if difficulty adapts based on performance
-                accuracies = []
-                difficulties = []
+                # Only the last 3 values are printed; the variation check uses
+                # the set of every difficulty seen
+                recent_accuracies = deque(maxlen=3)
+                recent_difficulties = deque(maxlen=3)
+                seen_difficulties = set()
                 
                 for i, sample in enumerate(feedback_samples):
-                    accuracy = sample['session_progress']['accuracy']
-                    accuracies.append(accuracy)
+                    recent_accuracies.append(sample['session_progress']['accuracy'])
                     
                     # Get next question to see difficulty adaptation
                     if i < len(generated_questions) - 1:
-                        difficulties.append(generated_questions[i+1]['difficulty'])
+                        difficulty = generated_questions[i+1]['difficulty']
+                        recent_difficulties.append(difficulty)
+                        seen_difficulties.add(difficulty)
                 
-                if len(accuracies) >= 2 and len(difficulties) >= 1:
-                    print(f"📊 Accuracy trend: {[f'{a:.1%}' for a in accuracies[-3:]]}")
-                    print(f"🎯 Difficulty trend: {difficulties[-3:]}")
+                if len(feedback_samples) >= 2 and seen_difficulties:
+                    print(f"📊 Accuracy trend: {[f'{a:.1%}' for a in recent_accuracies]}")
+                    print(f"🎯 Difficulty trend: {list(recent_difficulties)}")
                     
                     # Check if system adapts (very basic check)
-                    if len(set(difficulties)) > 1:  # Difficulty changed
+                    if len(seen_difficulties) > 1:  # Difficulty changed
                         print("✅ Adaptive behavior detected: Difficulty levels varied")
                         test_results["adaptive_behavior"] = True
                     else:
@@ -184,10 +219,10 @@ async def complete_system_test():
             
             for session_data, topic in quiz_sessions[:2]:  # Test first 2 sessions
                 session_id = session_data['session_id']
-                response = await client.get(f"{BASE_URL}/quiz/session/{session_id}")
+                response = await client.get(f"/quiz/session/{session_id}")
                 
                 if response.status_code == 200:
-                    session_info = response.json()
+                    session_info = orjson.loads(response.content)
                     print(f"📊 Session {session_id}:")
                     print(f"   Topic: {session_info['topic']}")
                     print(f"   Questions: {session_info['total_questions']}")
@@ -220,13 +255,12 @@ async def complete_system_test():
             
         except Exception as e:
             print(f"\n❌ Test suite failed with exception: {e}")
-            import traceback
             traceback.print_exc()
             
         return test_results
 
 if __name__ == "__main__":
-    results = asyncio.run(complete_system_test())
+    results = run(complete_system_test())
     success_rate = sum(results.values()) / len(results)
     exit_code = 0 if success_rate == 1.0 else 1
     exit(exit_code)
\ No newline at end of file
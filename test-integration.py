@@ -2,124 +2,175 @@
 Integration test that simulates complete user flow
 """
 import asyncio
+import sys
+from pathlib import Path
+from statistics import median
+from time import perf_counter_ns
 import httpx
-import json
+import orjson
 
-BASE_URL = "http://localhost:8000/api/v1"
+# Share the client settings of the backend integration tests
+sys.path.append(str(Path(__file__).parent / "backend" / "tests" / "integration"))
 
-async def full_integration_test():
+from http_client import JSON_HEADERS, create_client
+from _runner import run
+
+async def full_integration_test(client):
     """Test the complete user flow from topic selection to quiz completion"""
-    async with httpx.AsyncClient() as client:
-        print("🚀 Running Full Integration Test")
-        print("=" * 50)
+    print("🚀 Running Full Integration Test")
+    print("=" * 50)
+    
+    # Wall-clock time per step, plus per-request samples from the question loop
+    step_ns = {}
+    question_ns = []
+    answer_ns = []
+    
+    # The health check and the topic list are independent, so fetch
+    # them concurrently
+    start = perf_counter_ns()
+    health_response, response = await asyncio.gather(
+        client.get("/health"),
+        client.get("/topics/flat")
+    )
+    step_ns["Health check + topics"] = perf_counter_ns() - start
+    
+    # Step 1: Health check
+    print("\n1. Health Check")
+    health_response.raise_for_status()
+    print("✅ Backend is healthy")
+    
+    # Step 2: Load topics
+    print("\n2. Loading AI Topics")
+    response.raise_for_status()
+    topics = orjson.loads(response.content)["topics"]
+    print(f"✅ Loaded {len(topics)} topics")
+    
+    # Find a good test topic (leaf node with moderate difficulty),
+    # stopping at the first match instead of filtering the whole catalog
+    test_topic = next(
+        (t for t in topics if t['parent_id'] is not None and 3 <= t['difficulty_min'] <= 6), None
+    )
+    if test_topic is None:
+        test_topic = next((t for t in topics if t['parent_id'] is not None), None)
+    if test_topic is None:
+        raise RuntimeError("No subtopics available to test")
+    
+    print(f"📘 Selected topic: {test_topic['name']} (Difficulty: {test_topic['difficulty_min']}-{test_topic['difficulty_max']})")
+    
+    # Step 3: Start quiz session
+    print("\n3. Starting Quiz Session")
+    quiz_data = {"topic_id": test_topic['id'], "user_id": 1}
+    start = perf_counter_ns()
+    response = await client.post("/quiz/start", content=orjson.dumps(quiz_data), headers=JSON_HEADERS)
+    step_ns["Quiz start"] = perf_counter_ns() - start
+    response.raise_for_status()
+    session = orjson.loads(response.content)
+    session_id = session['session_id']
+    question_path = f"/quiz/question/{session_id}"
+    print(f"✅ Quiz session {session_id} started for topic: {test_topic['name']}")
+    
+    # Step 4: Complete multiple questions to test adaptive behavior
+    questions_completed = 0
+    session_progress = None
+    
+    # Reused for every answer; it is serialized before each POST is sent
+    answer_data = {"quiz_question_id": None, "answer": None, "time_spent": 0}
+    
+    loop_start = perf_counter_ns()
+    for question_num in range(1, 6):  # Test 5 questions
+        print(f"\n4.{question_num} Question {question_num}")
+        
+        # Get question
+        start = perf_counter_ns()
+        response = await client.get(question_path)
+        question_ns.append(perf_counter_ns() - start)
+        response.raise_for_status()
+        question = orjson.loads(response.content)
+        print(f"📝 Question: {question['question'][:80]}...")
+        print(f"🎯 Difficulty: {question['difficulty']}/10")
+        print(f"📋 Options: {len(question['options'])} choices")
+        
+        # Submit answer (always pick first option for consistency)
+        answer_data["quiz_question_id"] = question['quiz_question_id']
+        answer_data["answer"] = question['options'][0]
+        answer_data["time_spent"] = 15 + question_num * 5  # Simulate varying response times
         
-        try:
-            # Step 1: Health check
-            print("\n1. Health Check")
-            response = await client.get(f"{BASE_URL}/health")
-            assert response.status_code == 200
-            print("✅ Backend is healthy")
-            
-            # Step 2: Load topics
-            print("\n2. Loading AI Topics")
-            response = await client.get(f"{BASE_URL}/topics/flat")
-            assert response.status_code == 200
-            topics = response.json()["topics"]
-            print(f"✅ Loaded {len(topics)} topics")
-            
-            # Find a good test topic (leaf node with moderate difficulty)
-            test_topics = [t for t in topics if t['parent_id'] is not None and 3 <= t['difficulty_min'] <= 6]
-            if not test_topics:
-                test_topics = [t for t in topics if t['parent_id'] is not None]
-            
-            test_topic = test_topics[0]
-            print(f"📘 Selected topic: {test_topic['name']} (Difficulty: {test_topic['difficulty_min']}-{test_topic['difficulty_max']})")
-            
-            # Step 3: Start quiz session
-            print("\n3. Starting Quiz Session")
-            quiz_data = {"topic_id": test_topic['id'], "user_id": 1}
-            response = await client.post(f"{BASE_URL}/quiz/start", json=quiz_data)
-            assert response.status_code == 200
-            session = response.json()
-            session_id = session['session_id']
-            print(f"✅ Quiz session {session_id} started for topic: {test_topic['name']}")
-            
-            # Step 4: Complete multiple questions to test adaptive behavior
-            questions_completed = 0
-            session_progress = None
-            
-            for question_num in range(1, 6):  # Test 5 questions
-                print(f"\n4.{question_num} Question {question_num}")
-                
-                # Get question
-                response = await client.get(f"{BASE_URL}/quiz/question/{session_id}")
-                assert response.status_code == 200
-                question = response.json()
-                print(f"📝 Question: {question['question'][:80]}...")
-                print(f"🎯 Difficulty: {question['difficulty']}/10")
-                print(f"📋 Options: {len(question['options'])} choices")
-                
-                # Submit answer (always pick first option for consistency)
-                answer_data = {
-                    "quiz_question_id": question['quiz_question_id'],
-                    "answer": question['options'][0],
-                    "time_spent": 15 + question_num * 5  # Simulate varying response times
-                }
-                
-                response = await client.post(f"{BASE_URL}/quiz/answer", json=answer_data)
-                assert response.status_code == 200
-                result = response.json()
-                
-                questions_completed += 1
-                session_progress = result['session_progress']
-                
-                status = "✅ Correct" if result['correct'] else "❌ Incorrect"
-                print(f"{status} - {result['explanation'][:80]}...")
-                print(f"📊 Progress: {session_progress['correct_answers']}/{session_progress['total_questions']} ({session_progress['accuracy']*100:.1f}%)")
-            
-            # Step 5: Verify session info
-            print(f"\n5. Session Summary")
-            response = await client.get(f"{BASE_URL}/quiz/session/{session_id}")
-            assert response.status_code == 200
-            session_info = response.json()
-            
-            print(f"📈 Final Stats:")
-            print(f"   • Topic: {session_info['topic']}")
-            print(f"   • Questions: {session_info['total_questions']}")
-            print(f"   • Correct: {session_info['correct_answers']}")
-            print(f"   • Accuracy: {session_info['accuracy']*100:.1f}%")
-            print(f"   • Started: {session_info['started_at']}")
-            
-            # Step 6: Test adaptive behavior by checking if difficulty changed
-            print(f"\n6. Testing Adaptive Behavior")
-            print("🧠 Checking if system adapts difficulty based on performance...")
-            
-            # Get one more question to see if difficulty adapted
-            response = await client.get(f"{BASE_URL}/quiz/question/{session_id}")
-            if response.status_code == 200:
-                final_question = response.json()
-                print(f"🎯 Next question difficulty: {final_question['difficulty']}/10")
-                
-                if session_info['accuracy'] > 0.7:
-                    print("📈 High accuracy - system should increase difficulty")
-                elif session_info['accuracy'] < 0.4:
-                    print("📉 Low accuracy - system should decrease difficulty")
-                else:
-                    print("⚖️  Moderate accuracy - system should maintain difficulty")
-            
-            print(f"\n🎉 Integration Test PASSED!")
-            print(f"✅ All {questions_completed} questions completed successfully")
-            print(f"✅ Adaptive quiz engine working correctly")
-            print(f"✅ Session management functional")
-            
-        except Exception as e:
-            print(f"\n❌ Integration Test FAILED: {e}")
-            import traceback
-            traceback.print_exc()
-            return False
+        start = perf_counter_ns()
+        response = await client.post("/quiz/answer", content=orjson.dumps(answer_data), headers=JSON_HEADERS)
+        answer_ns.append(perf_counter_ns() - start)
+        response.raise_for_status()
+        result = orjson.loads(response.content)
         
-        return True
+        questions_completed += 1
+        session_progress = result['session_progress']
+        
+        status = "✅ Correct" if result['correct'] else "❌ Incorrect"
+        print(f"{status} - {result['explanation'][:80]}...")
+        print(f"📊 Progress: {session_progress['correct_answers']}/{session_progress['total_questions']} ({session_progress['accuracy']*100:.1f}%)")
+    
+    step_ns[f"{questions_completed} questions"] = perf_counter_ns() - loop_start
+    
+    # Step 5: Verify session info
+    print(f"\n5. Session Summary")
+    # Session stats only change when an answer is submitted, so the
+    # question for step 6 is fetched alongside the summary
+    start = perf_counter_ns()
+    response, next_response = await asyncio.gather(
+        client.get(f"/quiz/session/{session_id}"),
+        client.get(question_path)
+    )
+    step_ns["Session summary + next question"] = perf_counter_ns() - start
+    response.raise_for_status()
+    session_info = orjson.loads(response.content)
+    
+    print(f"📈 Final Stats:")
+    print(f"   • Topic: {session_info['topic']}")
+    print(f"   • Questions: {session_info['total_questions']}")
+    print(f"   • Correct: {session_info['correct_answers']}")
+    print(f"   • Accuracy: {session_info['accuracy']*100:.1f}%")
+    print(f"   • Started: {session_info['started_at']}")
+    
+    # Step 6: Test adaptive behavior by checking if difficulty changed
+    print(f"\n6. Testing Adaptive Behavior")
+    print("🧠 Checking if system adapts difficulty based on performance...")
+    
+    # One more question shows whether difficulty adapted
+    if next_response.status_code == 200:
+        final_question = orjson.loads(next_response.content)
+        print(f"🎯 Next question difficulty: {final_question['difficulty']}/10")
+        
+        if session_info['accuracy'] > 0.7:
+            print("📈 High accuracy - system should increase difficulty")
+        elif session_info['accuracy'] < 0.4:
+            print("📉 Low accuracy - system should decrease difficulty")
+        else:
+            print("⚖️  Moderate accuracy - system should maintain difficulty")
+    
+    print(f"\n⏱️  Latency (ms):")
+    for step, elapsed_ns in step_ns.items():
+        print(f"   • {step}: {elapsed_ns / 1e6:.1f}")
+    print(f"   • Answer round-trip: median {median(answer_ns) / 1e6:.1f}, max {max(answer_ns) / 1e6:.1f}")
+    print(f"   • Question round-trip: median {median(question_ns) / 1e6:.1f}, max {max(question_ns) / 1e6:.1f}")
+    
+    print(f"\n🎉 Integration Test PASSED!")
+    print(f"✅ All {questions_completed} questions completed successfully")
+    print(f"✅ Adaptive quiz engine working correctly")
+    print(f"✅ Session management functional")
+
+async def main():
+    """Run the integration test with a client kept alive for the whole flow"""
+    # The backend is plain HTTP on loopback: skip proxy lookup from the
+    # environment and CA bundle loading for an SSL context never used.
+    # Keep idle connections for 30s, and fail fast on connect or pool waits;
+    # reads stay at 30s because question generation calls the LLM
+    async with create_client(
+        trust_env=False,
+        verify=False,
+        keepalive_expiry=30.0,
+        timeout=httpx.Timeout(30.0, connect=2.0, pool=5.0)
+    ) as client:
+        await full_integration_test(client)
 
 if __name__ == "__main__":
-    success = asyncio.run(full_integration_test())
-    exit(0 if success else 1)
\ No newline at end of file
+    # A failing step raises; run() prints its traceback and exits with status 1
+    run(main())
\ No newline at end of file